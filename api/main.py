@@ -1,23 +1,140 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from typing import Optional, List
-import json
+from fastapi.responses import ORJSONResponse, Response
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, List
+import asyncio
+import hashlib
+import orjson
+import redis.asyncio as redis
+
+from document_parser.models import (
+    ParsedDocument, ParseRequest, ErrorResponse, ConfigurableField,
+    BatchSubmitResponse, BatchStatus, BatchResult
+)
+from document_parser.config import get_settings, get_default_configurable_fields
+from document_parser.pdf_processor import (
+    PDFProcessor, InvalidPDFError, EmptyTextExtractionError, run_in_process_pool, shutdown_executor
+)
+from document_parser.core import (
+    DocumentParser, BatchFieldsTooLongError, BatchNotFoundError, BatchNotReadyError, BatchFailedError
+)
+
+
+async def _warm_up_openai():
+    """Open a connection to OpenAI ahead of the first parse"""
+    client = document_parser._get_client().with_options(
+        timeout=settings.openai_connect_timeout_seconds
+    )
+    try:
+        # Cheap request that opens a TLS connection to OpenAI
+        await client.models.list()
+    except Exception as e:
+        print(f"OpenAI warm-up request failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the OpenAI client on startup and close connections on shutdown"""
+    # Warm up in the background so an unreachable OpenAI never delays startup
+    warm_up = asyncio.create_task(_warm_up_openai())
+
+    yield
 
-from document_parser.models import ParsedDocument, ParseRequest, ErrorResponse, ConfigurableField
-from document_parser.config import settings, DEFAULT_CONFIGURABLE_FIELDS
-from document_parser.pdf_processor import PDFProcessor
-from document_parser.core import DocumentParser
+    warm_up.cancel()
+    await document_parser._get_client().close()
+    shutdown_executor()
+    if result_cache is not None:
+        await result_cache.aclose()
 
 
 app = FastAPI(
     title="Document Parser API",
     description="A document parsing platform that extracts structured data from PDF files using OpenAI",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+settings = get_settings()
+
 # Initialize processors
 pdf_processor = PDFProcessor()
 document_parser = DocumentParser()
 
+# Uploads are read in chunks of this size so oversized files are rejected early
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Parsed results cached by PDF content hash
+result_cache = redis.from_url(settings.redis_url) if settings.redis_url else None
+
+
+def _cache_key(
+    endpoint: str,
+    pdf_content: bytes,
+    configurable_fields: Optional[List[ConfigurableField]],
+    extraction_instructions: Optional[str],
+    high_quality: bool = False
+) -> str:
+    """Build a cache key from the endpoint, the PDF content and the extraction options"""
+    fields = configurable_fields if configurable_fields is not None else get_default_configurable_fields()
+    options = orjson.dumps(
+        {
+            # /parse may fall back to vision while /parse-with-json never does
+            "endpoint": endpoint,
+            "model": settings.openai_model,
+            "vision_model": settings.openai_vision_model,
+            "vision_high_quality_model": settings.openai_vision_high_quality_model,
+            "fields": [field.model_dump() for field in fields],
+            "instructions": extraction_instructions,
+            "high_quality": high_quality,
+        },
+        option=orjson.OPT_SORT_KEYS
+    )
+    pdf_hash = hashlib.sha256(pdf_content).hexdigest()
+    options_hash = hashlib.sha256(options).hexdigest()
+    return f"parsed:{pdf_hash}:{options_hash}"
+
+
+async def _get_cached_result(key: str) -> Optional[bytes]:
+    """Return the cached, already serialized result for key, if any"""
+    if result_cache is None:
+        return None
+    try:
+        cached = await result_cache.get(key)
+    except Exception as e:
+        print(f"Result cache lookup failed: {e}")
+        return None
+    return cached
+
+
+async def _set_cached_result(key: str, parsed_result: Dict[str, Any]):
+    """Store a parsed result in the cache"""
+    if result_cache is None:
+        return
+    try:
+        await result_cache.set(key, orjson.dumps(parsed_result), ex=settings.cache_ttl_seconds)
+    except Exception as e:
+        print(f"Result cache store failed: {e}")
+
+
+async def _read_upload(file: UploadFile) -> bytearray:
+    """
+    Read an uploaded file, aborting as soon as it exceeds the size limit
+
+    The buffer is returned as-is rather than copied into ``bytes``; every
+    consumer (hashing, PyMuPDF, PyPDF2) accepts a bytearray.
+    """
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
+            )
+    return buffer
+
 
 @app.get("/")
 async def root():
@@ -36,17 +153,24 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """OpenAI request concurrency, used to tune OPENAI_MAX_CONCURRENT_REQUESTS"""
+    return document_parser.get_metrics()
+
+
 @app.get("/default-fields")
 async def get_default_fields():
     """Get the list of default configurable fields"""
-    return {"default_fields": DEFAULT_CONFIGURABLE_FIELDS}
+    return {"default_fields": get_default_configurable_fields()}
 
 
-@app.post("/parse", response_model=ParsedDocument)
+@app.post("/parse", response_model=None, responses={200: {"model": ParsedDocument}})
 async def parse_document(
     file: UploadFile = File(..., description="PDF file to parse"),
     custom_fields: Optional[str] = Form(None, description="JSON string of custom ConfigurableField objects"),
-    extraction_instructions: Optional[str] = Form(None, description="Additional instructions for extraction")
+    extraction_instructions: Optional[str] = Form(None, description="Additional instructions for extraction"),
+    high_quality: bool = Form(False, description="Use the larger vision model for image-based PDFs")
 ):
     """
     Parse a PDF document and extract structured data
@@ -55,6 +179,7 @@ async def parse_document(
         file: PDF file to parse
         custom_fields: Optional JSON string containing custom fields to extract
         extraction_instructions: Optional additional instructions for the LLM
+        high_quality: Use the larger vision model if the PDF falls back to vision
 
     Returns:
         ParsedDocument with extracted fields
@@ -68,70 +193,75 @@ async def parse_document(
         )
 
     try:
-        # Read file content
-        pdf_content = await file.read()
-
-        # Check file size
-        file_size_mb = len(pdf_content) / (1024 * 1024)
-        if file_size_mb > settings.max_file_size_mb:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
-            )
-
-        # Validate PDF
-        if not pdf_processor.validate_pdf(pdf_content):
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid PDF file"
-            )
-
-        # Extract text from PDF
-        try:
-            document_text = pdf_processor.extract_text_from_pdf(pdf_content)
-            use_vision = False
-        except Exception as text_error:
-            # If text extraction fails, fall back to vision API
-            print(f"Text extraction failed: {text_error}. Attempting vision processing...")
-            try:
-                base64_images = pdf_processor.convert_pdf_to_images(pdf_content)
-                use_vision = True
-            except Exception as vision_error:
-                raise HTTPException(
-                    status_code=422,
-                    detail=f"Both text extraction and image conversion failed. Text error: {text_error}. Vision error: {vision_error}"
-                )
-
         # Parse custom fields if provided
         configurable_fields = None
         if custom_fields:
             try:
-                custom_fields_data = json.loads(custom_fields)
+                custom_fields_data = orjson.loads(custom_fields)
                 configurable_fields = [
                     ConfigurableField(**field_data)
                     for field_data in custom_fields_data
                 ]
-            except (json.JSONDecodeError, ValueError) as e:
+            except (orjson.JSONDecodeError, ValueError) as e:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Invalid custom_fields JSON: {str(e)}"
                 )
 
+        # Read file content (raises 413 once the size limit is exceeded)
+        pdf_content = await _read_upload(file)
+
+        # Identical uploads with identical options reuse the earlier result
+        cache_key = _cache_key("parse", pdf_content, configurable_fields, extraction_instructions, high_quality)
+        cached_result = await _get_cached_result(cache_key)
+        if cached_result is not None:
+            return Response(content=cached_result, media_type="application/json")
+
+        # Extract text from PDF (this is also where the PDF is validated)
+        text_error = None
+        try:
+            document_text = await run_in_process_pool(pdf_processor.extract_text_from_pdf, pdf_content)
+        except InvalidPDFError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+        except EmptyTextExtractionError as e:
+            # Scanned/image-only PDF: go straight to the vision API
+            text_error = e
+        except Exception as e:
+            # If text extraction fails, fall back to vision API
+            print(f"Text extraction failed: {e}. Attempting vision processing...")
+            text_error = e
+
+        use_vision = text_error is not None
+        if use_vision:
+            try:
+                base64_images = await run_in_process_pool(pdf_processor.convert_pdf_to_images, pdf_content)
+            except Exception as vision_error:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Both text extraction and image conversion failed. Text error: {text_error}. Vision error: {vision_error}"
+                )
+
         # Parse document
         if use_vision:
-            parsed_result = document_parser.parse_document_images(
+            parsed_result = await document_parser.parse_document_images(
                 base64_images=base64_images,
                 configurable_fields=configurable_fields,
-                extraction_instructions=extraction_instructions
+                extraction_instructions=extraction_instructions,
+                high_quality=high_quality
             )
         else:
-            parsed_result = document_parser.parse_document(
+            parsed_result = await document_parser.parse_document(
                 document_text=document_text,
                 configurable_fields=configurable_fields,
                 extraction_instructions=extraction_instructions
             )
 
-        return parsed_result
+        await _set_cached_result(cache_key, parsed_result)
+
+        return ORJSONResponse(parsed_result)
 
     except HTTPException:
         raise
@@ -142,7 +272,7 @@ async def parse_document(
         )
 
 
-@app.post("/parse-with-json", response_model=ParsedDocument)
+@app.post("/parse-with-json", response_model=None, responses={200: {"model": ParsedDocument}})
 async def parse_document_with_json(
     file: UploadFile = File(..., description="PDF file to parse"),
     parse_request: str = Form(..., description="JSON string of ParseRequest object")
@@ -168,43 +298,48 @@ async def parse_document_with_json(
     try:
         # Parse request data
         try:
-            request_data = json.loads(parse_request)
+            request_data = orjson.loads(parse_request)
             parse_req = ParseRequest(**request_data)
-        except (json.JSONDecodeError, ValueError) as e:
+        except (orjson.JSONDecodeError, ValueError) as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid parse_request JSON: {str(e)}"
             )
 
-        # Read file content
-        pdf_content = await file.read()
+        # Read file content (raises 413 once the size limit is exceeded)
+        pdf_content = await _read_upload(file)
 
-        # Check file size
-        file_size_mb = len(pdf_content) / (1024 * 1024)
-        if file_size_mb > settings.max_file_size_mb:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File size exceeds maximum allowed size of {settings.max_file_size_mb}MB"
-            )
+        # Identical uploads with identical options reuse the earlier result
+        cache_key = _cache_key("parse-with-json", pdf_content, parse_req.custom_fields, parse_req.extraction_instructions)
+        cached_result = await _get_cached_result(cache_key)
+        if cached_result is not None:
+            return Response(content=cached_result, media_type="application/json")
 
-        # Validate PDF
-        if not pdf_processor.validate_pdf(pdf_content):
+        # Extract text from PDF (this is also where the PDF is validated)
+        try:
+            document_text = await run_in_process_pool(pdf_processor.extract_text_from_pdf, pdf_content)
+        except InvalidPDFError as e:
             raise HTTPException(
                 status_code=400,
-                detail="Invalid PDF file"
+                detail=str(e)
+            )
+        except EmptyTextExtractionError as e:
+            # This endpoint has no vision fallback
+            raise HTTPException(
+                status_code=422,
+                detail=f"{str(e)}. Use /parse for scanned or image-based PDFs"
             )
-
-        # Extract text from PDF
-        document_text = pdf_processor.extract_text_from_pdf(pdf_content)
 
         # Parse document
-        parsed_result = document_parser.parse_document(
+        parsed_result = await document_parser.parse_document(
             document_text=document_text,
             configurable_fields=parse_req.custom_fields,
             extraction_instructions=parse_req.extraction_instructions
         )
 
-        return parsed_result
+        await _set_cached_result(cache_key, parsed_result)
+
+        return ORJSONResponse(parsed_result)
 
     except HTTPException:
         raise
@@ -213,3 +348,141 @@ async def parse_document_with_json(
             status_code=500,
             detail=f"Failed to process document: {str(e)}"
         )
+
+
+@app.post("/parse-batch", response_model=BatchSubmitResponse)
+async def parse_batch(
+    files: List[UploadFile] = File(..., description="PDF files to parse"),
+    custom_fields: Optional[str] = Form(None, description="JSON string of custom ConfigurableField objects"),
+    extraction_instructions: Optional[str] = Form(None, description="Additional instructions for extraction")
+):
+    """
+    Submit several PDF documents as one OpenAI Batch API job
+
+    Batch jobs complete asynchronously (within 24h) at a lower cost than
+    individual /parse calls. Poll /batch-status/{batch_id} and fetch the
+    parsed documents from /batch-result/{batch_id}.
+
+    Args:
+        files: PDF files to parse
+        custom_fields: Optional JSON string containing custom fields to extract
+        extraction_instructions: Optional additional instructions for the LLM
+
+    Returns:
+        BatchSubmitResponse with the batch ID and the custom_id of each file
+    """
+
+    for file in files:
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Only PDF files are supported: {file.filename}"
+            )
+
+    try:
+        # Parse custom fields if provided
+        configurable_fields = None
+        if custom_fields:
+            try:
+                custom_fields_data = orjson.loads(custom_fields)
+                configurable_fields = [
+                    ConfigurableField(**field_data)
+                    for field_data in custom_fields_data
+                ]
+            except (orjson.JSONDecodeError, ValueError) as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid custom_fields JSON: {str(e)}"
+                )
+
+        documents = []
+        for file in files:
+            pdf_content = await _read_upload(file)
+
+            # Batch jobs are text-only; there is no vision fallback
+            try:
+                documents.append(await run_in_process_pool(pdf_processor.extract_text_from_pdf, pdf_content))
+            except InvalidPDFError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{file.filename}: {str(e)}"
+                )
+            except Exception as text_error:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Text extraction failed for {file.filename}: {text_error}"
+                )
+
+        try:
+            batch_id = await document_parser.submit_batch(
+                documents=documents,
+                configurable_fields=configurable_fields,
+                extraction_instructions=extraction_instructions
+            )
+        except BatchFieldsTooLongError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+
+        return BatchSubmitResponse(
+            batch_id=batch_id,
+            documents={str(doc_id): file.filename for doc_id, file in enumerate(files)}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to submit batch: {str(e)}"
+        )
+
+
+@app.get("/batch-status/{batch_id}", response_model=BatchStatus)
+async def batch_status(batch_id: str):
+    """Get the status of a batch submitted through /parse-batch"""
+    try:
+        return await document_parser.get_batch_status(batch_id)
+    except BatchNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get batch status: {str(e)}"
+        )
+
+
+@app.get("/batch-result/{batch_id}", response_model=BatchResult)
+async def batch_result(batch_id: str):
+    """
+    Get the parsed documents of a completed batch, keyed by custom_id
+
+    Returns 404 for an unknown batch, 409 while the batch is still running
+    and 410 if it failed, expired or was cancelled.
+    """
+    try:
+        return await document_parser.get_batch_results(batch_id)
+    except BatchNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
+    except BatchNotReadyError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=str(e)
+        )
+    except BatchFailedError as e:
+        raise HTTPException(
+            status_code=410,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get batch results: {str(e)}"
+        )
@@ -5,11 +5,12 @@ Main entry point for the Document Parser API server
 
 import uvicorn
 from api.main import app
-from document_parser.config import settings
+from document_parser.config import get_settings
 
 
 def main():
     """Start the Document Parser API server"""
+    settings = get_settings()
     uvicorn.run(
         "api.main:app",
         host=settings.host,
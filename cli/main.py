@@ -6,37 +6,38 @@ Simple CLI tool for testing the document parser
 import argparse
 import asyncio
 import aiohttp
-import json
 from pathlib import Path
+from typing import List
 
 
-async def parse_document(file_path: str, custom_fields_file: str = None, instructions: str = None):
+BASE_URL = "http://localhost:8000"
+
+# Maximum number of files open and in flight at once (matches the connector limit)
+MAX_CONCURRENT_UPLOADS = 100
+
+
+async def parse_document(
+    session: aiohttp.ClientSession,
+    file_path: str,
+    custom_fields: str = None,
+    instructions: str = None
+):
     """Parse a document using the API"""
 
     if not Path(file_path).exists():
         print(f"Error: File {file_path} not found")
         return
 
-    base_url = "http://localhost:8000"
+    file_path_obj = Path(file_path)
 
-    async with aiohttp.ClientSession() as session:
-        # Prepare form data
+    # Prepare form data; the open file is streamed by aiohttp instead of read into memory
+    with open(file_path_obj, 'rb') as f:
         data = aiohttp.FormData()
-
-        # Add file
-        file_path_obj = Path(file_path)
-        with open(file_path_obj, 'rb') as f:
-            file_content = f.read()
-            data.add_field('file', file_content, filename=file_path_obj.name, content_type='application/pdf')
+        data.add_field('file', f, filename=file_path_obj.name, content_type='application/pdf')
 
         # Add custom fields if provided
-        if custom_fields_file:
-            if Path(custom_fields_file).exists():
-                with open(custom_fields_file, 'r') as f:
-                    custom_fields = f.read()
-                data.add_field('custom_fields', custom_fields)
-            else:
-                print(f"Warning: Custom fields file {custom_fields_file} not found")
+        if custom_fields:
+            data.add_field('custom_fields', custom_fields)
 
         # Add instructions if provided
         if instructions:
@@ -44,45 +45,74 @@ async def parse_document(file_path: str, custom_fields_file: str = None, instruc
 
         # Make request
         try:
-            async with session.post(f"{base_url}/parse", data=data) as response:
+            async with session.post(f"{BASE_URL}/parse", data=data) as response:
                 if response.status == 200:
                     result = await response.json()
-                    print("Document parsed successfully!")
+                    print(f"Document {file_path_obj.name} parsed successfully!")
                     print("=" * 50)
 
-                    print("\\nConfigurable Fields:")
+                    print("\nConfigurable Fields:")
                     for field, value in result['configurable_fields'].items():
                         print(f"  {field}: {value}")
 
-                    print("\\nDiscovered Fields:")
+                    print("\nDiscovered Fields:")
                     for field, value in result['discovered_fields'].items():
                         print(f"  {field}: {value}")
 
                     if result.get('confidence_score'):
-                        print(f"\\nConfidence Score: {result['confidence_score']}")
+                        print(f"\nConfidence Score: {result['confidence_score']}")
 
                     if result.get('processing_notes'):
-                        print(f"\\nProcessing Notes: {result['processing_notes']}")
+                        print(f"\nProcessing Notes: {result['processing_notes']}")
+
+                    print()
 
                 else:
                     error_data = await response.json()
-                    print(f"Error {response.status}: {error_data.get('detail', 'Unknown error')}")
+                    print(f"Error {response.status} ({file_path_obj.name}): {error_data.get('detail', 'Unknown error')}")
 
         except aiohttp.ClientConnectorError:
-            print("Error: Could not connect to the server. Make sure it's running on http://localhost:8000")
+            print(f"Error: Could not connect to the server. Make sure it's running on {BASE_URL}")
         except Exception as e:
-            print(f"Error: {str(e)}")
+            print(f"Error ({file_path_obj.name}): {str(e)}")
+
+
+async def parse_documents(file_paths: List[str], custom_fields_file: str = None, instructions: str = None):
+    """Parse several documents concurrently over one pooled session"""
+
+    # Read custom fields once for all documents
+    custom_fields = None
+    if custom_fields_file:
+        if Path(custom_fields_file).exists():
+            with open(custom_fields_file, 'r') as f:
+                custom_fields = f.read()
+        else:
+            print(f"Warning: Custom fields file {custom_fields_file} not found")
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+    async def parse_with_limit(session: aiohttp.ClientSession, file_path: str):
+        # Take a slot before the file is opened so only a bounded number are open
+        async with semaphore:
+            await parse_document(session, file_path, custom_fields, instructions)
+
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_UPLOADS, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(
+            parse_with_limit(session, file_path)
+            for file_path in file_paths
+        ))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Document Parser CLI Tool")
-    parser.add_argument("file", help="Path to PDF file to parse")
+    parser.add_argument("files", nargs="+", help="Path(s) to PDF file(s) to parse")
     parser.add_argument("--custom-fields", help="Path to JSON file with custom fields")
     parser.add_argument("--instructions", help="Additional extraction instructions")
 
     args = parser.parse_args()
 
-    asyncio.run(parse_document(args.file, args.custom_fields, args.instructions))
+    asyncio.run(parse_documents(args.files, args.custom_fields, args.instructions))
 
 
 if __name__ == "__main__":
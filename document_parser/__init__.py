@@ -8,12 +8,14 @@ __version__ = "1.0.0"
 __author__ = "Document Parser Team"
 
 from .core import DocumentParser
-from .pdf_processor import PDFProcessor
+from .pdf_processor import PDFProcessor, InvalidPDFError, EmptyTextExtractionError
 from .models import ParsedDocument, ConfigurableField, ParseRequest
 
 __all__ = [
     "DocumentParser",
     "PDFProcessor",
+    "InvalidPDFError",
+    "EmptyTextExtractionError",
     "ParsedDocument",
     "ConfigurableField",
     "ParseRequest",
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 from .models import ConfigurableField
 
 
@@ -7,6 +8,18 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
+    openai_vision_model: str = "gpt-4o-mini"
+    openai_vision_high_quality_model: str = "gpt-4o"
+
+    # OpenAI HTTP connection pool
+    openai_max_connections: int = 1000
+    openai_timeout_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 5.0
+
+    # OpenAI request throttling
+    openai_max_concurrent_requests: int = 250
+    openai_rate_limit_retries: int = 3
+    openai_rate_limit_backoff_seconds: float = 1.0
 
     # Server Configuration
     host: str = "0.0.0.0"
@@ -17,6 +30,10 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 10
     allowed_extensions: str = "pdf"  # Changed from List[str] to str
 
+    # Result cache (disabled when redis_url is not set)
+    redis_url: Optional[str] = None
+    cache_ttl_seconds: int = 86400
+
     class Config:
         env_file = ".env"
 
@@ -26,48 +43,54 @@ class Settings(BaseSettings):
         return [ext.strip() for ext in self.allowed_extensions.split(",")]
 
 
-# Default configurable fields that are commonly extracted from documents
-DEFAULT_CONFIGURABLE_FIELDS = [
-    ConfigurableField(
-        name="document_type",
-        description="Type of document (e.g., invoice, contract, resume, etc.)",
-        data_type="string"
-    ),
-    ConfigurableField(
-        name="date",
-        description="Primary date mentioned in the document",
-        data_type="date"
-    ),
-    ConfigurableField(
-        name="company_name",
-        description="Company or organization name",
-        data_type="string"
-    ),
-    ConfigurableField(
-        name="person_name",
-        description="Person's name (if applicable)",
-        data_type="string"
-    ),
-    ConfigurableField(
-        name="email",
-        description="Email address",
-        data_type="string"
-    ),
-    ConfigurableField(
-        name="phone",
-        description="Phone number",
-        data_type="string"
-    ),
-    ConfigurableField(
-        name="amount",
-        description="Monetary amount (if applicable)",
-        data_type="number"
-    ),
-    ConfigurableField(
-        name="address",
-        description="Physical address",
-        data_type="string"
-    ),
-]
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment once per process"""
+    return Settings()
+
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_default_configurable_fields() -> List[ConfigurableField]:
+    """Default configurable fields that are commonly extracted from documents"""
+    return [
+        ConfigurableField(
+            name="document_type",
+            description="Type of document (e.g., invoice, contract, resume, etc.)",
+            data_type="string"
+        ),
+        ConfigurableField(
+            name="date",
+            description="Primary date mentioned in the document",
+            data_type="date"
+        ),
+        ConfigurableField(
+            name="company_name",
+            description="Company or organization name",
+            data_type="string"
+        ),
+        ConfigurableField(
+            name="person_name",
+            description="Person's name (if applicable)",
+            data_type="string"
+        ),
+        ConfigurableField(
+            name="email",
+            description="Email address",
+            data_type="string"
+        ),
+        ConfigurableField(
+            name="phone",
+            description="Phone number",
+            data_type="string"
+        ),
+        ConfigurableField(
+            name="amount",
+            description="Monetary amount (if applicable)",
+            data_type="number"
+        ),
+        ConfigurableField(
+            name="address",
+            description="Physical address",
+            data_type="string"
+        ),
+    ]
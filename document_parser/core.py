@@ -1,33 +1,268 @@
+import asyncio
+import random
+import re
 import openai
-import json
-from typing import Dict, Any, List, Optional
-from .models import ConfigurableField, ParsedDocument
-from .config import settings, DEFAULT_CONFIGURABLE_FIELDS
+import httpx
+import orjson
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from .models import ConfigurableField, BatchStatus, BatchResult
+from .config import get_settings, get_default_configurable_fields
+
+
+TEXT_SYSTEM_PROMPT = "You are an expert document parser. Extract information accurately and return it in the specified JSON format."
+VISION_SYSTEM_PROMPT = "You are an expert document parser. Analyze document images and extract information accurately, returning it in the specified JSON format."
+
+# Prompt templates, filled in with str.format_map
+TEXT_PROMPT_TEMPLATE = """
+Please analyze the following document and extract information according to these requirements:
+
+CONFIGURABLE FIELDS TO EXTRACT:
+{fields_description}
+
+DOCUMENT TEXT:
+{document_text}
+
+INSTRUCTIONS:
+1. Extract values for the configurable fields listed above. If a field is not found in the document, set its value to null.
+2. Additionally, identify and extract any other relevant information you find in the document that might be valuable.
+3. Provide YOUR OWN confidence score between 0.0 and 1.0 based on your assessment of:
+   - How clear and readable the document text was
+   - How certain you are about the field value matches
+   - How complete your extraction is
+   - Overall document quality and structure
+4. Return the response in the following JSON format:
+
+{{
+    "configurable_fields": {{
+        "field_name": "extracted_value_or_null"
+    }},
+    "discovered_fields": {{
+        "other_field_name": "extracted_value"
+    }},
+    "confidence_score": <number_between_0_and_1>,
+    "processing_notes": "Any relevant notes about the extraction process"
+}}
+
+ADDITIONAL EXTRACTION INSTRUCTIONS:
+{extraction_instructions}
+
+Please ensure the JSON is valid and complete. For dates, use ISO format (YYYY-MM-DD). For amounts, extract numeric values without currency symbols.
+
+IMPORTANT: Generate a genuine confidence score based on your actual assessment - do not use example values!
+"""
+
+VISION_PROMPT_TEMPLATE = """
+Please analyze the document images and extract information according to these requirements:
+
+CONFIGURABLE FIELDS TO EXTRACT:
+{fields_description}
+
+INSTRUCTIONS:
+1. Extract values for the configurable fields listed above. If a field is not found in the document, set its value to null.
+2. Additionally, identify and extract any other relevant information you find in the document that might be valuable.
+3. Provide YOUR OWN confidence score between 0.0 and 1.0 based on your assessment of:
+   - How clear and readable the document images are
+   - How certain you are about the field value matches
+   - How complete your extraction is
+   - Overall document quality and structure
+4. Return the response in the following JSON format:
+
+{{
+    "configurable_fields": {{
+        "field_name": "extracted_value_or_null"
+    }},
+    "discovered_fields": {{
+        "other_field_name": "extracted_value"
+    }},
+    "confidence_score": <number_between_0_and_1>,
+    "processing_notes": "Any relevant notes about the extraction process"
+}}
+
+{additional_instructions}
+"""
+
+# Completion token budget: a fixed overhead plus an allowance per configurable field
+MAX_TOKENS_BASE = 300
+MAX_TOKENS_PER_FIELD = 80
+MAX_TOKENS_LIMIT = 2000
+
+# Vision requests use low image detail when fields x pages is at most this
+LOW_DETAIL_MAX_FIELD_PAGES = 4
+
+# A JSON object inside a markdown code fence, optionally tagged as json
+FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Transient OpenAI errors retried by _create_completion
+RETRYABLE_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# Longer retry-after values are ignored in favour of our own backoff
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Batch metadata key holding the configurable field names as a JSON array
+BATCH_FIELDS_METADATA_KEY = "configurable_fields"
+
+# OpenAI caps each batch metadata value at this many characters
+BATCH_METADATA_VALUE_MAX_LENGTH = 512
+
+# Terminal batch statuses that produce no usable results
+BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+
+class BatchFieldsTooLongError(Exception):
+    """Raised when the configurable field names do not fit in batch metadata"""
+
+
+class BatchNotFoundError(Exception):
+    """Raised when a batch ID is unknown to OpenAI"""
+
+
+class BatchNotReadyError(Exception):
+    """Raised when batch results are requested before the batch has completed"""
+
+
+class BatchFailedError(Exception):
+    """Raised when a batch ended without completing (failed, expired or cancelled)"""
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server's retry-after headers, if any and reasonable"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        if "retry-after-ms" in response.headers:
+            retry_after = float(response.headers["retry-after-ms"]) / 1000
+        elif "retry-after" in response.headers:
+            retry_after = float(response.headers["retry-after"])
+        else:
+            return None
+    except ValueError:
+        # HTTP-date values are not worth parsing; use our own backoff
+        return None
+    if 0 <= retry_after <= MAX_RETRY_AFTER_SECONDS:
+        return retry_after
+    return None
+
+
+def _field_key(configurable_fields: List[ConfigurableField]) -> Tuple[Tuple[str, str, str], ...]:
+    """Hashable identity of a field list, used as the description cache key"""
+    return tuple((field.name, field.data_type, field.description) for field in configurable_fields)
+
+
+@lru_cache(maxsize=128)
+def _format_fields_desc(fields: Tuple[Tuple[str, str, str], ...]) -> str:
+    """Render the configurable fields block of the extraction prompts"""
+    return "\n".join(
+        f"- {name} ({data_type}): {description}"
+        for name, data_type, description in fields
+    )
+
+
+def _max_tokens_for(configurable_fields: List[ConfigurableField]) -> int:
+    """Completion token budget scaled to the number of fields requested"""
+    return min(MAX_TOKENS_LIMIT, MAX_TOKENS_BASE + MAX_TOKENS_PER_FIELD * len(configurable_fields))
 
 
 class DocumentParser:
     """Handles document parsing using OpenAI API"""
 
     def __init__(self):
-        # Initialize client as None - will create when needed
+        # Initialize client and semaphore as None - will create when needed
         self.client = None
+        self.semaphore = None
+        self.active_requests = 0
+        self.waiting_requests = 0
 
     def _get_client(self):
-        """Get or create OpenAI client"""
+        """Get or create the shared async OpenAI client"""
         if self.client is None:
+            settings = get_settings()
             try:
-                # Simple client initialization without extra parameters
-                self.client = openai.OpenAI(api_key=settings.openai_api_key)
+                # Large keep-alive pool so concurrent requests don't queue for a connection
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.openai_max_connections,
+                        max_keepalive_connections=settings.openai_max_connections
+                    ),
+                    timeout=httpx.Timeout(
+                        settings.openai_timeout_seconds,
+                        connect=settings.openai_connect_timeout_seconds
+                    )
+                )
+                # Retries are handled by _create_completion, outside the concurrency slot
+                self.client = openai.AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    http_client=http_client,
+                    max_retries=0
+                )
             except Exception as e:
                 raise Exception(f"Failed to initialize OpenAI client: {str(e)}")
         return self.client
 
-    def parse_document(
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get or create the semaphore bounding concurrent OpenAI requests"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(get_settings().openai_max_concurrent_requests)
+        return self.semaphore
+
+    @asynccontextmanager
+    async def _openai_slot(self):
+        """Hold one of the concurrent OpenAI request slots, queueing locally if none is free"""
+        semaphore = self._get_semaphore()
+        self.waiting_requests += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting_requests -= 1
+
+        self.active_requests += 1
+        try:
+            yield
+        finally:
+            self.active_requests -= 1
+            semaphore.release()
+
+    async def _create_completion(self, **kwargs):
+        """Create a chat completion, backing off exponentially on transient errors"""
+        settings = get_settings()
+        client = self._get_client()
+
+        for attempt in range(settings.openai_rate_limit_retries + 1):
+            try:
+                async with self._openai_slot():
+                    return await client.chat.completions.create(**kwargs)
+            except RETRYABLE_OPENAI_ERRORS as e:
+                if attempt == settings.openai_rate_limit_retries:
+                    raise
+                retry_after = _retry_after_seconds(e)
+            # Back off outside the slot so other requests can use it meanwhile
+            if retry_after is not None:
+                await asyncio.sleep(retry_after)
+            else:
+                delay = settings.openai_rate_limit_backoff_seconds * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Current OpenAI request concurrency, for tuning the concurrency limit"""
+        return {
+            "openai_max_concurrent_requests": get_settings().openai_max_concurrent_requests,
+            "openai_active_requests": self.active_requests,
+            "openai_waiting_requests": self.waiting_requests,
+        }
+
+    async def parse_document(
         self,
         document_text: str,
         configurable_fields: Optional[List[ConfigurableField]] = None,
         extraction_instructions: Optional[str] = None
-    ) -> ParsedDocument:
+    ) -> Dict[str, Any]:
         """
         Parse document text using OpenAI API
 
@@ -37,10 +272,11 @@ class DocumentParser:
             extraction_instructions: Additional instructions for extraction
 
         Returns:
-            ParsedDocument with extracted fields
+            Dict with the extracted fields, in the ParsedDocument shape
         """
         if configurable_fields is None:
-            configurable_fields = DEFAULT_CONFIGURABLE_FIELDS
+            configurable_fields = get_default_configurable_fields()
+        settings = get_settings()
 
         # Build the prompt
         prompt = self._build_extraction_prompt(
@@ -50,19 +286,15 @@ class DocumentParser:
         )
 
         try:
-            client = self._get_client()
-
-            response = client.chat.completions.create(
+            response = await self._create_completion(
                 model=settings.openai_model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert document parser. Extract information accurately and return it in the specified JSON format."
-                    },
+                    {"role": "system", "content": TEXT_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,  # Low temperature for consistent extraction
-                max_tokens=2000
+                max_tokens=_max_tokens_for(configurable_fields),
+                response_format={"type": "json_object"}
             )
 
             # Parse the response
@@ -74,12 +306,13 @@ class DocumentParser:
         except Exception as e:
             raise Exception(f"Failed to parse document with OpenAI: {str(e)}")
 
-    def parse_document_images(
+    async def parse_document_images(
         self,
         base64_images: List[str],
         configurable_fields: Optional[List[ConfigurableField]] = None,
-        extraction_instructions: Optional[str] = None
-    ) -> ParsedDocument:
+        extraction_instructions: Optional[str] = None,
+        high_quality: bool = False
+    ) -> Dict[str, Any]:
         """
         Parse document from images using OpenAI Vision API
 
@@ -87,80 +320,49 @@ class DocumentParser:
             base64_images: List of base64-encoded images (one per page)
             configurable_fields: List of fields to extract (uses defaults if None)
             extraction_instructions: Additional instructions for extraction
+            high_quality: Use the larger vision model instead of the default one
 
         Returns:
-            ParsedDocument with extracted fields
+            Dict with the extracted fields, in the ParsedDocument shape
         """
         if configurable_fields is None:
-            configurable_fields = DEFAULT_CONFIGURABLE_FIELDS
-
-        # Build the extraction instructions
-        fields_description = "\\n".join([
-            f"- {field.name} ({field.data_type}): {field.description}"
-            for field in configurable_fields
-        ])
-
-        # Create the text prompt
-        text_prompt = f"""
-Please analyze the document images and extract information according to these requirements:
-
-CONFIGURABLE FIELDS TO EXTRACT:
-{fields_description}
+            configurable_fields = get_default_configurable_fields()
+        settings = get_settings()
 
-INSTRUCTIONS:
-1. Extract values for the configurable fields listed above. If a field is not found in the document, set its value to null.
-2. Additionally, identify and extract any other relevant information you find in the document that might be valuable.
-3. Provide YOUR OWN confidence score between 0.0 and 1.0 based on your assessment of:
-   - How clear and readable the document images are
-   - How certain you are about the field value matches
-   - How complete your extraction is
-   - Overall document quality and structure
-4. Return the response in the following JSON format:
-
-{{
-    "configurable_fields": {{
-        "field_name": "extracted_value_or_null"
-    }},
-    "discovered_fields": {{
-        "other_field_name": "extracted_value"
-    }},
-    "confidence_score": <number_between_0_and_1>,
-    "processing_notes": "Any relevant notes about the extraction process"
-}}
-
-{f"ADDITIONAL INSTRUCTIONS: {extraction_instructions}" if extraction_instructions else ""}
-"""
+        # Build the prompt
+        text_prompt = self._build_vision_prompt(configurable_fields, extraction_instructions)
 
         try:
-            client = self._get_client()
-
             # Prepare the message content with images
             content = [{"type": "text", "text": text_prompt}]
 
+            model = settings.openai_vision_high_quality_model if high_quality else settings.openai_vision_model
+
+            # Small extractions are fine with low detail (85 tokens per image)
+            detail = "low" if len(configurable_fields) * len(base64_images) <= LOW_DETAIL_MAX_FIELD_PAGES else "high"
+
             # Add each image to the content
             for img_base64 in base64_images:
                 content.append({
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{img_base64}",
-                        "detail": "high"
+                        "url": f"data:image/jpeg;base64,{img_base64}",
+                        "detail": detail
                     }
                 })
 
-            response = client.chat.completions.create(
-                model="gpt-4o",  # Use vision-capable model
+            response = await self._create_completion(
+                model=model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert document parser. Analyze document images and extract information accurately, returning it in the specified JSON format."
-                    },
+                    {"role": "system", "content": VISION_SYSTEM_PROMPT},
                     {
                         "role": "user",
                         "content": content
                     }
                 ],
                 temperature=0.1,  # Low temperature for consistent extraction
-                max_tokens=2000
+                max_tokens=_max_tokens_for(configurable_fields),
+                response_format={"type": "json_object"}
             )
 
             # Parse the response
@@ -172,81 +374,225 @@ INSTRUCTIONS:
         except Exception as e:
             raise Exception(f"Failed to parse document images with OpenAI Vision: {str(e)}")
 
-    def _build_extraction_prompt(
+    async def submit_batch(
         self,
-        document_text: str,
-        configurable_fields: List[ConfigurableField],
+        documents: List[str],
+        configurable_fields: Optional[List[ConfigurableField]] = None,
         extraction_instructions: Optional[str] = None
     ) -> str:
-        """Build the extraction prompt for OpenAI"""
+        """
+        Submit several documents as a single OpenAI Batch API job
 
-        # Build configurable fields description
-        fields_description = "\\n".join([
-            f"- {field.name} ({field.data_type}): {field.description}"
-            for field in configurable_fields
-        ])
+        Each document becomes one chat completion request whose custom_id
+        is its index in ``documents``.
 
-        prompt = f"""
-Please analyze the following document and extract information according to these requirements:
+        Args:
+            documents: Text content of each document
+            configurable_fields: List of fields to extract (uses defaults if None)
+            extraction_instructions: Additional instructions for extraction
 
-CONFIGURABLE FIELDS TO EXTRACT:
-{fields_description}
+        Returns:
+            ID of the created batch
 
-DOCUMENT TEXT:
-{document_text}
+        Raises:
+            BatchFieldsTooLongError: If the field names do not fit in batch metadata
+        """
+        if configurable_fields is None:
+            configurable_fields = get_default_configurable_fields()
+        settings = get_settings()
+
+        fields_metadata = orjson.dumps([field.name for field in configurable_fields]).decode("utf-8")
+        if len(fields_metadata) > BATCH_METADATA_VALUE_MAX_LENGTH:
+            raise BatchFieldsTooLongError(
+                f"Configurable field names take {len(fields_metadata)} characters in batch metadata; "
+                f"the limit is {BATCH_METADATA_VALUE_MAX_LENGTH}"
+            )
 
-INSTRUCTIONS:
-1. Extract values for the configurable fields listed above. If a field is not found in the document, set its value to null.
-2. Additionally, identify and extract any other relevant information you find in the document that might be valuable.
-3. Provide YOUR OWN confidence score between 0.0 and 1.0 based on your assessment of:
-   - How clear and readable the document text was
-   - How certain you are about the field value matches
-   - How complete your extraction is
-   - Overall document quality and structure
-4. Return the response in the following JSON format:
+        lines = []
+        for doc_id, document_text in enumerate(documents):
+            prompt = self._build_extraction_prompt(
+                document_text,
+                configurable_fields,
+                extraction_instructions
+            )
+            lines.append(orjson.dumps({
+                "custom_id": str(doc_id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": settings.openai_model,
+                    "messages": [
+                        {"role": "system", "content": TEXT_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": _max_tokens_for(configurable_fields),
+                    "response_format": {"type": "json_object"}
+                }
+            }))
 
-{{
-    "configurable_fields": {{
-        "field_name": "extracted_value_or_null"
-    }},
-    "discovered_fields": {{
-        "other_field_name": "extracted_value"
-    }},
-    "confidence_score": <number_between_0_and_1>,
-    "processing_notes": "Any relevant notes about the extraction process"
-}}
+        try:
+            client = self._get_client()
 
-ADDITIONAL EXTRACTION INSTRUCTIONS:
-{extraction_instructions or "None"}
+            batch_file = await client.files.create(
+                file=("batch.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+                # Field names are needed again to shape the results
+                metadata={BATCH_FIELDS_METADATA_KEY: fields_metadata}
+            )
 
-Please ensure the JSON is valid and complete. For dates, use ISO format (YYYY-MM-DD). For amounts, extract numeric values without currency symbols.
+            return batch.id
 
-IMPORTANT: Generate a genuine confidence score based on your actual assessment - do not use example values!
-"""
+        except Exception as e:
+            raise Exception(f"Failed to submit batch to OpenAI: {str(e)}")
+
+    async def get_batch_status(self, batch_id: str) -> BatchStatus:
+        """
+        Get the status of a submitted batch
+
+        Args:
+            batch_id: ID returned by submit_batch
+
+        Returns:
+            BatchStatus with the batch state and request counts
+
+        Raises:
+            BatchNotFoundError: If no batch with this ID exists
+        """
+        batch = await self._retrieve_batch(batch_id)
+
+        counts = batch.request_counts
+        return BatchStatus(
+            batch_id=batch.id,
+            status=batch.status,
+            total=counts.total if counts else None,
+            completed=counts.completed if counts else None,
+            failed=counts.failed if counts else None
+        )
+
+    async def get_batch_results(self, batch_id: str) -> BatchResult:
+        """
+        Download and parse the output of a completed batch
+
+        Requests that succeeded are read from the batch output file; requests
+        that failed are read from the batch error file and reported in
+        ``errors``.
+
+        Args:
+            batch_id: ID returned by submit_batch
+
+        Returns:
+            BatchResult with one ParsedDocument per successful document
+
+        Raises:
+            BatchNotFoundError: If no batch with this ID exists
+            BatchNotReadyError: If the batch is still running
+            BatchFailedError: If the batch failed, expired or was cancelled
+        """
+        batch = await self._retrieve_batch(batch_id)
+
+        if batch.status in BATCH_FAILED_STATUSES:
+            raise BatchFailedError(f"Batch {batch_id} did not complete (status: {batch.status})")
+        if batch.status != "completed":
+            raise BatchNotReadyError(f"Batch {batch_id} is not completed yet (status: {batch.status})")
+
+        configurable_fields = [
+            ConfigurableField(name=name, description="")
+            for name in orjson.loads((batch.metadata or {}).get(BATCH_FIELDS_METADATA_KEY, "[]"))
+        ]
+
+        results = {}
+        errors = {}
+        # The output file holds successful requests, the error file failed ones;
+        # either may be missing when every request landed in the other
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            try:
+                content = await self._get_client().files.content(file_id)
+            except Exception as e:
+                raise Exception(f"Failed to download batch output from OpenAI: {str(e)}")
+
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                item = orjson.loads(line)
+                doc_id = item["custom_id"]
+                response = item.get("response")
+                if item.get("error") or not response or response.get("status_code") != 200:
+                    errors[doc_id] = str(item.get("error") or (response or {}).get("body"))
+                    continue
+                try:
+                    response_text = response["body"]["choices"][0]["message"]["content"]
+                    results[doc_id] = self._parse_llm_response(response_text, configurable_fields)
+                except Exception as e:
+                    errors[doc_id] = str(e)
+
+        return BatchResult(batch_id=batch_id, results=results, errors=errors)
+
+    async def _retrieve_batch(self, batch_id: str):
+        """Retrieve a batch, mapping an unknown ID to BatchNotFoundError"""
+        try:
+            client = self._get_client()
+            return await client.batches.retrieve(batch_id)
+        except openai.NotFoundError:
+            raise BatchNotFoundError(f"Batch {batch_id} not found")
+        except Exception as e:
+            raise Exception(f"Failed to retrieve batch from OpenAI: {str(e)}")
+
+    def _build_vision_prompt(
+        self,
+        configurable_fields: List[ConfigurableField],
+        extraction_instructions: Optional[str] = None
+    ) -> str:
+        """Build the text part of the vision extraction prompt"""
+        return VISION_PROMPT_TEMPLATE.format_map({
+            "fields_description": _format_fields_desc(_field_key(configurable_fields)),
+            "additional_instructions": f"ADDITIONAL INSTRUCTIONS: {extraction_instructions}" if extraction_instructions else "",
+        })
+
+    def _build_extraction_prompt(
+        self,
+        document_text: str,
+        configurable_fields: List[ConfigurableField],
+        extraction_instructions: Optional[str] = None
+    ) -> str:
+        """Build the extraction prompt for OpenAI"""
+
+        prompt = TEXT_PROMPT_TEMPLATE.format_map({
+            "fields_description": _format_fields_desc(_field_key(configurable_fields)),
+            "document_text": document_text,
+            "extraction_instructions": extraction_instructions or "None",
+        })
         return prompt
 
     def _parse_llm_response(
         self,
         response_text: str,
         configurable_fields: List[ConfigurableField]
-    ) -> ParsedDocument:
-        """Parse the LLM response into a ParsedDocument"""
-
-        try:
-            # Try to extract JSON from the response
-            response_text = response_text.strip()
+    ) -> Dict[str, Any]:
+        """
+        Parse the LLM response into a dict shaped like ParsedDocument
 
-            # Handle cases where the response might have markdown formatting
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + 3
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
+        A plain dict is returned so the API can serialize it directly,
+        without building and re-validating a ParsedDocument per request.
+        """
 
-            parsed_data = json.loads(response_text)
+        try:
+            # Requests use JSON mode, so the response is normally a bare JSON object
+            try:
+                parsed_data = orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                # Fall back to a JSON object wrapped in a markdown code fence
+                match = FENCED_JSON_RE.search(response_text)
+                if not match:
+                    raise
+                parsed_data = orjson.loads(match.group(1))
 
             # Initialize configurable fields with None values
             configurable_fields_result = {}
@@ -263,14 +609,14 @@ IMPORTANT: Generate a genuine confidence score based on your actual assessment -
             confidence_score = parsed_data.get("confidence_score")
             processing_notes = parsed_data.get("processing_notes")
 
-            return ParsedDocument(
-                configurable_fields=configurable_fields_result,
-                discovered_fields=discovered_fields,
-                confidence_score=confidence_score,
-                processing_notes=processing_notes
-            )
+            return {
+                "configurable_fields": configurable_fields_result,
+                "discovered_fields": discovered_fields,
+                "confidence_score": float(confidence_score) if confidence_score is not None else None,
+                "processing_notes": processing_notes,
+            }
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise Exception(f"Failed to parse LLM response as JSON: {str(e)}")
         except Exception as e:
             raise Exception(f"Failed to process LLM response: {str(e)}")
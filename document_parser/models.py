@@ -24,6 +24,28 @@ class ParseRequest(BaseModel):
     extraction_instructions: Optional[str] = None
 
 
+class BatchSubmitResponse(BaseModel):
+    """Response model for a submitted batch parsing job"""
+    batch_id: str
+    documents: Dict[str, str]  # custom_id -> uploaded filename
+
+
+class BatchStatus(BaseModel):
+    """Status of a batch parsing job"""
+    batch_id: str
+    status: str
+    total: Optional[int] = None
+    completed: Optional[int] = None
+    failed: Optional[int] = None
+
+
+class BatchResult(BaseModel):
+    """Results of a completed batch parsing job"""
+    batch_id: str
+    results: Dict[str, ParsedDocument]
+    errors: Dict[str, str] = {}
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     error: str
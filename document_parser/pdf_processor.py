@@ -1,9 +1,100 @@
+import fitz
 import PyPDF2
+import asyncio
 import io
-from typing import Optional, List
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, List, Tuple
 import base64
-from pdf2image import convert_from_bytes
-from PIL import Image
+
+
+# Bytes searched at each end of the file for the PDF header / EOF marker
+PDF_MARKER_WINDOW = 1024
+
+# Extracted text shorter than this (after stripping) is treated as no text
+MIN_TEXT_LENGTH = 20
+
+# Rendering settings for the vision fallback
+IMAGE_DPI = 150
+IMAGE_JPEG_QUALITY = 85
+
+# Shared worker pool, created on first use. PyMuPDF is not thread-safe, so
+# all fitz work runs here, one document per worker process at a time.
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        # Spawn rather than fork: the server process is multithreaded
+        _executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def run_in_process_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking PDF function in the shared process pool
+
+    If a worker died (e.g. MuPDF crashed on a malformed PDF) the pool is
+    discarded so the next call starts a fresh one.
+
+    Args:
+        func: Picklable function to run, e.g. PDFProcessor.extract_text_from_pdf
+        *args: Arguments passed to func
+
+    Returns:
+        The return value of func
+
+    Raises:
+        BrokenProcessPool: If a worker process died while running func
+    """
+    global _executor
+    executor = _get_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        if _executor is executor:
+            _executor = None
+            executor.shutdown(wait=False)
+        raise
+
+
+def _encode_page(page) -> str:
+    """Render a page as a base64-encoded JPEG"""
+    # JPEG at 150 DPI keeps the payload small while staying legible
+    pixmap = page.get_pixmap(dpi=IMAGE_DPI)
+    image_bytes = pixmap.tobytes("jpeg", jpg_quality=IMAGE_JPEG_QUALITY)
+    return base64.b64encode(image_bytes).decode('ascii')
+
+
+def shutdown_executor() -> None:
+    """Shut down the shared process pool, if it was started"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+class InvalidPDFError(Exception):
+    """Raised when the uploaded content is not a readable PDF"""
+
+
+class EmptyTextExtractionError(Exception):
+    """Raised when a PDF has no meaningful text layer (e.g. scanned documents)"""
+
+    def __init__(self, page_count: int):
+        self.page_count = page_count
+        super().__init__(f"No text could be extracted from the PDF ({page_count} pages)")
+
+    def __reduce__(self):
+        # Rebuild from page_count when unpickled from a worker process
+        return (EmptyTextExtractionError, (self.page_count,))
 
 
 class PDFProcessor:
@@ -14,6 +105,11 @@ class PDFProcessor:
         """
         Extract text content from PDF bytes
 
+        Uses PyMuPDF for extraction and falls back to PyPDF2 if MuPDF
+        cannot open the document. The document is only parsed here, so this
+        is also where malformed PDFs are detected. This is CPU-bound and
+        blocking; async callers should use run_in_process_pool.
+
         Args:
             pdf_content: PDF file content as bytes
 
@@ -21,71 +117,92 @@ class PDFProcessor:
             Extracted text as string
 
         Raises:
+            InvalidPDFError: If the content is not a readable PDF
+            EmptyTextExtractionError: If the PDF has (almost) no extractable text
             Exception: If PDF processing fails
         """
-        try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+        if not PDFProcessor.validate_pdf(pdf_content):
+            raise InvalidPDFError("Invalid PDF file")
 
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+        try:
+            try:
+                text, page_count = PDFProcessor._extract_text_with_fitz(pdf_content)
+            except Exception:
+                # Fall back to PyPDF2 for documents MuPDF rejects
+                text, page_count = PDFProcessor._extract_text_with_pypdf2(pdf_content)
 
             # Clean up the text
             text = text.strip()
-            if not text:
-                raise Exception("No text could be extracted from the PDF")
+            if len(text) < MIN_TEXT_LENGTH:
+                raise EmptyTextExtractionError(page_count=page_count)
 
             return text
 
+        except EmptyTextExtractionError:
+            raise
+        except PyPDF2.errors.PdfReadError as e:
+            # Neither MuPDF nor PyPDF2 could read the document
+            raise InvalidPDFError(f"Invalid PDF file: {str(e)}")
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
+    @staticmethod
+    def _extract_text_with_fitz(pdf_content: bytes) -> Tuple[str, int]:
+        """Extract text and page count with PyMuPDF"""
+        doc = fitz.open(stream=pdf_content, filetype="pdf")
+        try:
+            return "\n".join(page.get_text("text") for page in doc), doc.page_count
+        finally:
+            doc.close()
+
+    @staticmethod
+    def _extract_text_with_pypdf2(pdf_content: bytes) -> Tuple[str, int]:
+        """Extract text and page count with PyPDF2 (fallback path)"""
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+        text = "\n".join(page.extract_text() for page in pdf_reader.pages)
+        return text, len(pdf_reader.pages)
+
     @staticmethod
     def validate_pdf(pdf_content: bytes) -> bool:
         """
-        Validate if the content is a valid PDF
+        Cheap check that the content looks like a PDF
+
+        Only the %PDF- header (in the first 1024 bytes) and the %%EOF marker
+        (in the last 1024 bytes) are inspected; the document itself is
+        parsed (and fully validated) by extract_text_from_pdf.
 
         Args:
             pdf_content: PDF file content as bytes
 
         Returns:
-            True if valid PDF, False otherwise
+            True if the content has a PDF header and end-of-file marker, False otherwise
         """
-        try:
-            pdf_file = io.BytesIO(pdf_content)
-            PyPDF2.PdfReader(pdf_file)
-            return True
-        except:
-            return False
+        return (
+            b"%PDF-" in pdf_content[:PDF_MARKER_WINDOW]
+            and b"%%EOF" in pdf_content[-PDF_MARKER_WINDOW:]
+        )
 
     @staticmethod
     def convert_pdf_to_images(pdf_content: bytes) -> List[str]:
         """
         Convert PDF pages to base64-encoded images for vision API
 
+        This is CPU-bound and blocking; async callers should use run_in_process_pool.
+
         Args:
             pdf_content: PDF file content as bytes
 
         Returns:
-            List of base64-encoded PNG images (one per page)
+            List of base64-encoded JPEG images (one per page)
 
         Raises:
             Exception: If PDF to image conversion fails
         """
         try:
-            # Convert PDF to images (200 DPI for good quality)
-            images = convert_from_bytes(pdf_content, dpi=200, fmt='PNG')
-
-            base64_images = []
-            for image in images:
-                # Convert PIL Image to base64
-                buffer = io.BytesIO()
-                image.save(buffer, format='PNG')
-                img_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                base64_images.append(img_str)
-
-            return base64_images
+            doc = fitz.open(stream=pdf_content, filetype="pdf")
+            try:
+                return [_encode_page(page) for page in doc]
+            finally:
+                doc.close()
         except Exception as e:
             raise Exception(f"Failed to convert PDF to images: {str(e)}")
@@ -8,10 +8,76 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 from datetime import datetime, timedelta
 import os
 
 
+# Styles are immutable once built, so share them across all documents
+_STYLES = getSampleStyleSheet()
+
+_INVOICE_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    textColor=colors.darkblue
+)
+
+_NAME_STYLE = ParagraphStyle(
+    'Name',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    alignment=1,  # Center
+    textColor=colors.darkblue
+)
+
+_CONTRACT_TITLE_STYLE = ParagraphStyle(
+    'Title',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    alignment=1,
+    textColor=colors.darkblue
+)
+
+
+# Spacers only report a fixed size when laid out, so one instance per size is reused
+_SPACER_15 = Spacer(1, 15)
+_SPACER_20 = Spacer(1, 20)
+_SPACER_30 = Spacer(1, 30)
+
+# Invoice table styles; TableStyle is not mutated by setStyle, so these are shared
+_INVOICE_INFO_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+])
+
+_INVOICE_ITEMS_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_INVOICE_TOTALS_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
+])
+
+
 def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     """Create a sample invoice PDF for testing"""
 
@@ -19,19 +85,9 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     doc = SimpleDocTemplate(filename, pagesize=letter)
     story = []
 
-    # Get styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        textColor=colors.darkblue
-    )
-
     # Title
-    story.append(Paragraph("INVOICE", title_style))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph("INVOICE", _INVOICE_TITLE_STYLE))
+    story.append(_SPACER_20)
 
     # Company info
     company_info = """
@@ -41,8 +97,8 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     Phone: (555) 123-4567<br/>
     Email: billing@acmecorp.com
     """
-    story.append(Paragraph(company_info, styles['Normal']))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph(company_info, _STYLES['Normal']))
+    story.append(_SPACER_20)
 
     # Invoice details
     invoice_date = datetime.now()
@@ -56,19 +112,13 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     ]
 
     invoice_table = Table(invoice_details, colWidths=[2*inch, 2*inch])
-    invoice_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
+    invoice_table.setStyle(_INVOICE_INFO_STYLE)
 
     story.append(invoice_table)
-    story.append(Spacer(1, 30))
+    story.append(_SPACER_30)
 
     # Bill to section
-    story.append(Paragraph("<b>Bill To:</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Bill To:</b>", _STYLES['Heading3']))
     bill_to = """
     John Smith<br/>
     Tech Solutions Inc.<br/>
@@ -77,11 +127,11 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     john.smith@techsolutions.com<br/>
     Phone: (555) 987-6543
     """
-    story.append(Paragraph(bill_to, styles['Normal']))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph(bill_to, _STYLES['Normal']))
+    story.append(_SPACER_20)
 
     # Items table
-    story.append(Paragraph("<b>Items:</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Items:</b>", _STYLES['Heading3']))
 
     items_data = [
         ['Description', 'Quantity', 'Unit Price', 'Total'],
@@ -92,20 +142,10 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     ]
 
     items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
-    items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    items_table.setStyle(_INVOICE_ITEMS_STYLE)
 
     story.append(items_table)
-    story.append(Spacer(1, 20))
+    story.append(_SPACER_20)
 
     # Totals
     totals_data = [
@@ -115,20 +155,13 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     ]
 
     totals_table = Table(totals_data, colWidths=[3*inch, 1*inch])
-    totals_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
-    ]))
+    totals_table.setStyle(_INVOICE_TOTALS_STYLE)
 
     story.append(totals_table)
-    story.append(Spacer(1, 30))
+    story.append(_SPACER_30)
 
     # Payment terms
-    story.append(Paragraph("<b>Payment Terms:</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Payment Terms:</b>", _STYLES['Heading3']))
     payment_terms = """
     Payment is due within 30 days of invoice date.<br/>
     Late payments may be subject to a 1.5% monthly service charge.<br/>
@@ -139,7 +172,7 @@ def create_sample_invoice_pdf(filename="sample_invoice.pdf"):
     - Wire Transfer: Account #123456789, Routing #987654321<br/>
     - Online Payment: www.acmecorp.com/pay
     """
-    story.append(Paragraph(payment_terms, styles['Normal']))
+    story.append(Paragraph(payment_terms, _STYLES['Normal']))
 
     # Build the PDF
     doc.build(story)
@@ -151,20 +184,10 @@ def create_sample_resume_pdf(filename="sample_resume.pdf"):
 
     doc = SimpleDocTemplate(filename, pagesize=letter)
     story = []
-    styles = getSampleStyleSheet()
-
     # Name and title
-    name_style = ParagraphStyle(
-        'Name',
-        parent=styles['Heading1'],
-        fontSize=24,
-        alignment=1,  # Center
-        textColor=colors.darkblue
-    )
-
-    story.append(Paragraph("Sarah Johnson", name_style))
-    story.append(Paragraph("Senior Software Engineer", styles['Heading2']))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph("Sarah Johnson", _NAME_STYLE))
+    story.append(Paragraph("Senior Software Engineer", _STYLES['Heading2']))
+    story.append(_SPACER_20)
 
     # Contact info
     contact_info = """
@@ -175,21 +198,21 @@ def create_sample_resume_pdf(filename="sample_resume.pdf"):
     LinkedIn: linkedin.com/in/sarahjohnson<br/>
     GitHub: github.com/sarahjohnson
     """
-    story.append(Paragraph(contact_info, styles['Normal']))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph(contact_info, _STYLES['Normal']))
+    story.append(_SPACER_20)
 
     # Professional summary
-    story.append(Paragraph("<b>Professional Summary</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Professional Summary</b>", _STYLES['Heading3']))
     summary = """
     Experienced software engineer with 8+ years of expertise in full-stack development,
     cloud architecture, and team leadership. Proven track record of delivering scalable
     solutions and mentoring junior developers. Specializes in Python, JavaScript, and AWS.
     """
-    story.append(Paragraph(summary, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(summary, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Work experience
-    story.append(Paragraph("<b>Work Experience</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Work Experience</b>", _STYLES['Heading3']))
 
     experience = """
     <b>Senior Software Engineer</b> | TechStart Inc. | 2020 - Present<br/>
@@ -207,11 +230,11 @@ def create_sample_resume_pdf(filename="sample_resume.pdf"):
     • Participated in code reviews and technical documentation<br/>
     • Learned modern development practices and tools
     """
-    story.append(Paragraph(experience, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(experience, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Education
-    story.append(Paragraph("<b>Education</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Education</b>", _STYLES['Heading3']))
     education = """
     <b>Master of Science in Computer Science</b><br/>
     University of Technology | 2014 - 2016<br/>
@@ -221,11 +244,11 @@ def create_sample_resume_pdf(filename="sample_resume.pdf"):
     State University | 2010 - 2014<br/>
     Magna Cum Laude, GPA: 3.7/4.0
     """
-    story.append(Paragraph(education, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(education, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Skills
-    story.append(Paragraph("<b>Technical Skills</b>", styles['Heading3']))
+    story.append(Paragraph("<b>Technical Skills</b>", _STYLES['Heading3']))
     skills = """
     <b>Programming Languages:</b> Python, JavaScript, TypeScript, Java, Go<br/>
     <b>Frameworks:</b> Django, Flask, React, Node.js, Express<br/>
@@ -233,7 +256,7 @@ def create_sample_resume_pdf(filename="sample_resume.pdf"):
     <b>Cloud:</b> AWS (EC2, S3, Lambda, RDS), Docker, Kubernetes<br/>
     <b>Tools:</b> Git, Jenkins, Terraform, Elasticsearch
     """
-    story.append(Paragraph(skills, styles['Normal']))
+    story.append(Paragraph(skills, _STYLES['Normal']))
 
     doc.build(story)
     print(f"✅ Created sample resume: {filename}")
@@ -244,32 +267,25 @@ def create_sample_contract_pdf(filename="sample_contract.pdf"):
 
     doc = SimpleDocTemplate(filename, pagesize=letter)
     story = []
-    styles = getSampleStyleSheet()
-
     # Title
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=18,
-        alignment=1,
-        textColor=colors.darkblue
-    )
-
-    story.append(Paragraph("SERVICE AGREEMENT", title_style))
-    story.append(Spacer(1, 20))
-
-    # Contract details
-    contract_info = """
+    story.append(Paragraph("SERVICE AGREEMENT", _CONTRACT_TITLE_STYLE))
+    story.append(_SPACER_20)
+
+    # Contract details (one timestamp so Date and Effective Date always match)
+    now = datetime.now()
+    today = now.strftime('%B %d, %Y')
+    expiry = (now + timedelta(days=365)).strftime('%B %d, %Y')
+    contract_info = f"""
     <b>Contract Number:</b> SA-2024-007<br/>
-    <b>Date:</b> """ + datetime.now().strftime('%B %d, %Y') + """<br/>
-    <b>Effective Date:</b> """ + datetime.now().strftime('%B %d, %Y') + """<br/>
-    <b>Expiration Date:</b> """ + (datetime.now() + timedelta(days=365)).strftime('%B %d, %Y') + """<br/>
+    <b>Date:</b> {today}<br/>
+    <b>Effective Date:</b> {today}<br/>
+    <b>Expiration Date:</b> {expiry}<br/>
     """
-    story.append(Paragraph(contract_info, styles['Normal']))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph(contract_info, _STYLES['Normal']))
+    story.append(_SPACER_20)
 
     # Parties
-    story.append(Paragraph("<b>PARTIES</b>", styles['Heading3']))
+    story.append(Paragraph("<b>PARTIES</b>", _STYLES['Heading3']))
     parties = """
     <b>Service Provider:</b><br/>
     Digital Solutions LLC<br/>
@@ -285,11 +301,11 @@ def create_sample_contract_pdf(filename="sample_contract.pdf"):
     Phone: (555) 333-4444<br/>
     Email: procurement@modernenterprises.com
     """
-    story.append(Paragraph(parties, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(parties, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Services
-    story.append(Paragraph("<b>SERVICES</b>", styles['Heading3']))
+    story.append(Paragraph("<b>SERVICES</b>", _STYLES['Heading3']))
     services = """
     The Service Provider agrees to provide the following services:<br/>
     1. Custom software development and maintenance<br/>
@@ -298,11 +314,11 @@ def create_sample_contract_pdf(filename="sample_contract.pdf"):
     4. Regular security audits and updates<br/>
     5. Staff training and documentation
     """
-    story.append(Paragraph(services, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(services, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Payment terms
-    story.append(Paragraph("<b>PAYMENT TERMS</b>", styles['Heading3']))
+    story.append(Paragraph("<b>PAYMENT TERMS</b>", _STYLES['Heading3']))
     payment = """
     <b>Total Contract Value:</b> $150,000.00<br/>
     <b>Payment Schedule:</b><br/>
@@ -313,11 +329,11 @@ def create_sample_contract_pdf(filename="sample_contract.pdf"):
     All payments are due within 15 days of invoice date.
     Late payments subject to 2% monthly penalty.
     """
-    story.append(Paragraph(payment, styles['Normal']))
-    story.append(Spacer(1, 15))
+    story.append(Paragraph(payment, _STYLES['Normal']))
+    story.append(_SPACER_15)
 
     # Signatures
-    story.append(Paragraph("<b>SIGNATURES</b>", styles['Heading3']))
+    story.append(Paragraph("<b>SIGNATURES</b>", _STYLES['Heading3']))
     signatures = """
     <b>Service Provider:</b><br/>
     _________________________<br/>
@@ -331,23 +347,59 @@ def create_sample_contract_pdf(filename="sample_contract.pdf"):
     Modern Enterprises Corp.<br/>
     Date: _________________
     """
-    story.append(Paragraph(signatures, styles['Normal']))
+    story.append(Paragraph(signatures, _STYLES['Normal']))
 
     doc.build(story)
     print(f"✅ Created sample contract: {filename}")
 
 
+# Sample kinds mapped to their builders (top-level so worker processes can use them)
+BUILDERS = {
+    "invoice": create_sample_invoice_pdf,
+    "resume": create_sample_resume_pdf,
+    "contract": create_sample_contract_pdf,
+}
+
+
+def _build(job):
+    """Build one sample PDF from a (kind, filename) pair"""
+    kind, filename = job
+    BUILDERS[kind](filename)
+
+
+def _is_fresh(filename):
+    """Whether filename exists and is newer than this script"""
+    return os.path.exists(filename) and os.path.getmtime(filename) >= os.path.getmtime(__file__)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sample PDF documents for testing")
+    parser.add_argument("--force", action="store_true", help="Rebuild PDFs even if they are up to date")
+    args = parser.parse_args()
+
     print("🔧 Generating sample PDF documents for testing...")
     print("=" * 50)
 
     # Create test_files directory
     os.makedirs("test_files", exist_ok=True)
 
-    # Generate sample PDFs
-    create_sample_invoice_pdf("test_files/sample_invoice.pdf")
-    create_sample_resume_pdf("test_files/sample_resume.pdf")
-    create_sample_contract_pdf("test_files/sample_contract.pdf")
+    jobs = [
+        ("invoice", "test_files/sample_invoice.pdf"),
+        ("resume", "test_files/sample_resume.pdf"),
+        ("contract", "test_files/sample_contract.pdf"),
+    ]
+
+    # Skip PDFs that were built after the last change to this script
+    if not args.force:
+        for kind, filename in jobs:
+            if _is_fresh(filename):
+                print(f"⏭️  Skipping up-to-date {filename} (use --force to rebuild)")
+        jobs = [(kind, filename) for kind, filename in jobs if not _is_fresh(filename)]
+
+    # Generate sample PDFs; the builds are independent, so run them in parallel
+    if jobs:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            list(executor.map(_build, jobs))
 
     print("\n🎉 Sample PDF files created in 'test_files/' directory:")
     print("- sample_invoice.pdf (invoice with financial data)")
@@ -0,0 +1,87 @@
+import httpx
+import pytest
+
+from document_parser.core import DocumentParser, _retry_after_seconds
+from document_parser.models import ConfigurableField
+
+
+FIELDS = [
+    ConfigurableField(name="invoice_number", description="Invoice or bill number"),
+    ConfigurableField(name="total_amount", description="Total amount due", data_type="number"),
+]
+
+RESPONSE_JSON = (
+    '{"configurable_fields": {"invoice_number": "INV-001", "total_amount": 150.5},'
+    ' "discovered_fields": {"vendor": {"name": "ACME"}},'
+    ' "confidence_score": 0.9, "processing_notes": null}'
+)
+
+
+@pytest.fixture
+def parser():
+    return DocumentParser()
+
+
+def test_parse_llm_response_bare_json(parser):
+    """Test parsing a bare JSON object"""
+    result = parser._parse_llm_response(RESPONSE_JSON, FIELDS)
+
+    assert result["configurable_fields"] == {"invoice_number": "INV-001", "total_amount": 150.5}
+    assert result["discovered_fields"] == {"vendor": {"name": "ACME"}}
+    assert result["confidence_score"] == 0.9
+    assert result["processing_notes"] is None
+
+
+def test_parse_llm_response_fenced_json(parser):
+    """Test parsing a JSON object wrapped in a markdown code fence"""
+    response_text = f"Here is the result:\n```json\n{RESPONSE_JSON}\n```"
+
+    result = parser._parse_llm_response(response_text, FIELDS)
+
+    assert result["configurable_fields"]["invoice_number"] == "INV-001"
+    assert result["discovered_fields"] == {"vendor": {"name": "ACME"}}
+
+
+def test_parse_llm_response_two_fenced_blocks(parser):
+    """Test that only the first of several fenced JSON objects is used"""
+    response_text = (
+        f"```json\n{RESPONSE_JSON}\n```\n"
+        "Alternative reading:\n"
+        '```json\n{"configurable_fields": {"invoice_number": "INV-002"}}\n```'
+    )
+
+    result = parser._parse_llm_response(response_text, FIELDS)
+
+    assert result["configurable_fields"]["invoice_number"] == "INV-001"
+    assert result["confidence_score"] == 0.9
+
+
+def test_parse_llm_response_missing_fields_default_to_none(parser):
+    """Test that configurable fields absent from the response are None"""
+    result = parser._parse_llm_response('{"configurable_fields": {"invoice_number": "INV-001"}}', FIELDS)
+
+    assert result["configurable_fields"] == {"invoice_number": "INV-001", "total_amount": None}
+    assert result["discovered_fields"] == {}
+
+
+def test_parse_llm_response_no_json(parser):
+    """Test that a response without any JSON object is rejected"""
+    with pytest.raises(Exception, match="Failed to"):
+        parser._parse_llm_response("I could not find any fields in this document.", FIELDS)
+
+
+def _error_with_headers(headers):
+    """An exception carrying an HTTP response, like openai.APIStatusError"""
+    error = Exception("rate limited")
+    error.response = httpx.Response(429, headers=headers)
+    return error
+
+
+def test_retry_after_seconds():
+    """Test that retry-after headers are honoured when reasonable"""
+    assert _retry_after_seconds(_error_with_headers({"retry-after": "2"})) == 2.0
+    assert _retry_after_seconds(_error_with_headers({"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert _retry_after_seconds(_error_with_headers({"retry-after": "3600"})) is None
+    assert _retry_after_seconds(_error_with_headers({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) is None
+    assert _retry_after_seconds(_error_with_headers({})) is None
+    assert _retry_after_seconds(Exception("connection reset")) is None